@@ -0,0 +1,81 @@
+"""
+Byte-level --numstat parser.
+
+Works on a NumPy uint8 view of git's raw stdout: line and tab positions, the
+decimal counts and the binary "-" markers are all whole-buffer array passes, so
+numstat lines never become Python strings. Headers need Unicode and are left to
+the caller as byte spans.
+"""
+from __future__ import annotations
+import numpy as np
+
+_NL = 0x0A
+_TAB = 0x09
+_DASH = 0x2D
+_ZERO = 0x30
+_MAX_DIGITS = 18  # int64-safe; git line counts never get close
+
+def parse_numstat(buf: np.ndarray, rec_sep: int) -> dict[str, np.ndarray]:
+    """
+    Parse a buffer of complete records (each starting with rec_sep) into per-record
+    arrays: header_start/header_end (header byte span without the marker), and the
+    int32 numstat sums added, deleted, files, binary_files.
+    """
+    n = len(buf)
+    nl = np.flatnonzero(buf == _NL)
+    starts = np.concatenate(([0], nl + 1))
+    ends = np.concatenate((nl, [n]))
+    keep = starts < ends
+    starts, ends = starts[keep], ends[keep]
+
+    is_header = buf[starts] == rec_sep
+    rec = np.cumsum(is_header) - 1
+    n_rec = int(rec[-1]) + 1 if len(rec) else 0
+
+    # numstat: <added>\t<deleted>\t<path>; needs two tabs inside the line (the path may hold more)
+    body = ~is_header & (rec >= 0)
+    ls, le, lrec = starts[body], ends[body], rec[body]
+    tabs = np.concatenate((np.flatnonzero(buf == _TAB), [n, n]))  # sentinels: never inside a line
+    i = np.searchsorted(tabs, ls)
+    t1, t2 = tabs[i], tabs[i + 1]
+    ok = t2 < le
+    ls, t1, t2, lrec = ls[ok], t1[ok], t2[ok], lrec[ok]
+
+    # binary changes: "-" in numstat; any other weird value counts as a file with 0 lines
+    binary = _is_dash(buf, ls, t1) | _is_dash(buf, t1 + 1, t2)
+    added = np.where(binary, 0, _parse_uint(buf, ls, t1))
+    deleted = np.where(binary, 0, _parse_uint(buf, t1 + 1, t2))
+
+    # lines come in record order, so each record owns one contiguous slice [bounds[i], bounds[i+1])
+    bounds = np.searchsorted(lrec, np.arange(n_rec + 1))
+    return {
+        "header_start": starts[is_header] + 1,
+        "header_end": ends[is_header],
+        "added": _segment_sums(added, bounds).astype(np.int32),
+        "deleted": _segment_sums(deleted, bounds).astype(np.int32),
+        "files": np.diff(bounds).astype(np.int32),
+        "binary_files": _segment_sums(binary, bounds).astype(np.int32),
+    }
+
+def _is_dash(buf: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    # start < len(buf) always holds: every field is followed by a tab
+    return (end - start == 1) & (buf[start] == _DASH)
+
+def _parse_uint(buf: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    # decimal fields buf[start:end], one digit position at a time (right to left) across all fields;
+    # empty, overlong or non-digit fields give 0
+    length = end - start
+    ok = (length > 0) & (length <= _MAX_DIGITS)
+    val = np.zeros(len(start), dtype=np.int64)
+    width = int(length[ok].max()) if ok.any() else 0
+    for k in range(width):
+        has = ok & (length > k)
+        d = buf[np.where(has, end - 1 - k, 0)].astype(np.int64) - _ZERO
+        ok &= ~has | ((d >= 0) & (d <= 9))
+        val += np.where(has, d, 0) * 10**k
+    return np.where(ok, val, 0)
+
+def _segment_sums(values: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    # sum of values[bounds[i]:bounds[i+1]] for every i; empty slices give 0 (unlike np.add.reduceat)
+    csum = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+    return csum[bounds[1:]] - csum[bounds[:-1]]
@@ -1,15 +1,16 @@
 from __future__ import annotations
 import argparse
 import os
+from datetime import date
 import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 
-from gitpulse.cache import load_cached, save_cached
-from gitpulse.gitlog import scan_commits, GitLogOptions, list_branches, current_branch, is_git_repo
-from gitpulse.metrics import add_derived, leaderboard, weekly_series, calendar_heatmap_df
+from gitpulse.cache import load_cached_subjects, refresh_cache
+from gitpulse.gitlog import list_branches, current_branch, is_git_repo, head_sha, STRING_DTYPE
+from gitpulse.metrics import add_derived, leaderboard, weekly_series, calendar_heatmap_df, date_range_mask
 
 def parse_args():
     ap = argparse.ArgumentParser(add_help=False)
@@ -18,26 +19,92 @@ def parse_args():
     ap.add_argument("--branch", default="")
     return ap.parse_known_args()[0]
 
-def ensure_derived(df: pd.DataFrame) -> pd.DataFrame:
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_or_scan(repo: str, branch: str | None, include_merges: bool, head: str | None = None) -> pd.DataFrame:
     """
-    Cache can have old columns. Always recompute author_key/label + time fields.
+    head is part of the memo key, so new commits on the branch invalidate it;
+    the disk cache itself is validated by refresh_cache.
     """
-    if df is None or df.empty:
-        return df
-    # Always enforce date type and recompute derived fields (key/label logic changes)
-    df["date"] = pd.to_datetime(df["date"], utc=True, errors="coerce")
-    return add_derived(df)
-
-def load_or_scan(repo: str, branch: str | None, include_merges: bool) -> pd.DataFrame:
-    df = load_cached(repo, branch)
-    if df is not None and not df.empty:
-        df = ensure_derived(df)
-        return df
-
-    df = scan_commits(repo, GitLogOptions(include_merges=include_merges, branch=branch))
-    df = add_derived(df)
-    save_cached(repo, branch, df)
-    return df
+    # subjects live in the cache sidecar, see load_subjects
+    return refresh_cache(repo, branch, include_merges, head)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_subjects(repo: str, branch: str | None, include_merges: bool, head: str | None = None) -> pd.DataFrame:
+    """
+    Commit subjects for the commits table, indexed by hash. Read separately from
+    load_or_scan so the leaderboard/chart path never touches the biggest column.
+    Keyed like load_or_scan, which rewrites the sidecar for each merge setting.
+    """
+    subjects = load_cached_subjects(repo, branch)
+    if subjects is None:
+        subjects = pd.DataFrame({"hash": pd.array([], dtype=STRING_DTYPE), "subject": pd.array([], dtype=STRING_DTYPE)})
+    return subjects.set_index("hash")
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def sidebar_inputs(source: tuple, _df: pd.DataFrame) -> tuple[pd.DataFrame, date, date, int]:
+    """
+    Everything the sidebar needs from the loaded frame: unique people
+    (author_key -> author_label), date bounds and the churn slider maximum.
+    Keyed on source, like filter_commits.
+    """
+    df = _df
+    # unique people by author_key, show author_label in UI
+    people = (
+        df[["author_key", "author_label"]]
+        .dropna()
+        .drop_duplicates()
+        .sort_values("author_label")
+        .reset_index(drop=True)
+    )
+    min_date = df["date"].min().date()
+    max_date = df["date"].max().date()
+    churn_max = int(df["churn"].quantile(0.99)) if len(df) > 10 else int(df["churn"].max())
+    return people, min_date, max_date, churn_max
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def filter_commits(
+    source: tuple,
+    _df: pd.DataFrame,
+    sel_keys: tuple[str, ...],
+    start,
+    end,
+    churn_thr_small: int,
+    hide_zero_files: bool,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Apply the sidebar filters and compute the KPI row. Both are memoized on the
+    slider values, so unrelated widget changes reuse them.
+    source = (repo, branch, include_merges, head) identifies _df, which is not hashed.
+    """
+    df = _df
+    # one combined mask, one slice (instead of a frame copy per filter step)
+    keys = df["author_key"].astype("category")
+    sel_codes = keys.cat.categories.get_indexer(list(sel_keys))
+    mask = np.isin(keys.cat.codes.to_numpy(), sel_codes[sel_codes >= 0])
+
+    mask &= date_range_mask(df["date"], start, end)
+    if hide_zero_files:
+        mask &= df["files"].to_numpy() > 0
+
+    dff = df.take(np.flatnonzero(mask))
+
+    # substance thresholds at runtime
+    dff["is_small"] = dff["churn"] <= churn_thr_small
+    dff["is_tiny"] = dff["churn"] <= 2
+    dff["is_big"] = dff["churn"] >= 300
+
+    # derived fields are computed once on load; only frames from elsewhere need them
+    if "week" not in dff.columns:
+        dff = add_derived(dff)
+
+    kpis = {
+        "commits": len(dff),
+        "authors": dff["author_key"].nunique(),
+        "churn": int(dff["churn"].sum()),
+        "net": int(dff["net"].sum()),
+        "avg_churn": float(dff["churn"].mean()) if len(dff) else 0.0,
+    }
+    return dff, kpis
 
 def main():
     args = parse_args()
@@ -78,13 +145,14 @@ def main():
         branch = None if sel_branch[0] == "HEAD" else sel_branch[0]
 
         include_merges = st.checkbox("Include merge commits", value=not args.no_merges)
+        head = head_sha(repo, branch)
 
         if st.button("Scan / Refresh cache", width="stretch"):
             try:
-                df_new = scan_commits(repo, GitLogOptions(include_merges=include_merges, branch=branch))
-                df_new = add_derived(df_new)
-                save_cached(repo, branch, df_new)
-                st.success(f"Scanned {len(df_new)} commits")
+                # only commits added since the cached head are scanned
+                load_or_scan.clear()
+                df_new = load_or_scan(repo, branch, include_merges, head)
+                st.success(f"Cache up to date: {len(df_new)} commits")
             except Exception as e:
                 st.error(str(e))
                 st.stop()
@@ -92,24 +160,19 @@ def main():
         st.divider()
 
     try:
-        df = load_or_scan(repo, branch=branch, include_merges=include_merges)
+        df = load_or_scan(repo, branch=branch, include_merges=include_merges, head=head)
     except Exception as e:
         st.error(str(e))
         return
     if df is None or df.empty:
         st.warning("No commits parsed.")
         return
+    # what load_or_scan was keyed on: the identity of df for the memoized steps below
+    source = (repo, branch, include_merges, head)
 
     # Sidebar filters
     with st.sidebar:
-        # unique people by author_key, show author_label in UI
-        people = (
-            df[["author_key", "author_label"]]
-            .dropna()
-            .drop_duplicates()
-            .sort_values("author_label")
-            .reset_index(drop=True)
-        )
+        people, min_date, max_date, churn_max = sidebar_inputs(source, df)
 
         label_options = people["author_label"].tolist()
 
@@ -118,8 +181,6 @@ def main():
         #min_date = df["date"].min().date()
         #max_date = df["date"].max().date()
         #dr = st.date_input("Date range", value=(min_date, max_date))
-        min_date = df["date"].min().date()
-        max_date = df["date"].max().date()
 
         range_mode = st.selectbox("Range", ["Last N months", "Custom (from–to)"], index=0)
 
@@ -140,7 +201,6 @@ def main():
                 start, end = min_date, max_date
 
 
-        churn_max = int(df["churn"].quantile(0.99)) if len(df) > 10 else int(df["churn"].max())
         churn_thr_small = st.slider("Small-commit threshold (churn)", 0, max(50, churn_max), 0)
 
         hide_zero_files = st.checkbox("Hide commits with 0 files (e.g. merges)", value=False)
@@ -156,17 +216,7 @@ def main():
 #    else:
 #        start, end = min_date, max_date
 
-    dff = df.copy()
-
-    # substance thresholds at runtime
-    dff["is_small"] = dff["churn"] <= churn_thr_small
-    dff["is_tiny"] = dff["churn"] <= 2
-    dff["is_big"] = dff["churn"] >= 300
-
-    dff = dff[dff["author_key"].isin(sel_keys)]
-    dff = dff[(dff["date"].dt.date >= start) & (dff["date"].dt.date <= end)]
-    if hide_zero_files:
-        dff = dff[dff["files"] > 0]
+    dff, kpis = filter_commits(source, df, tuple(sel_keys), start, end, churn_thr_small, hide_zero_files)
 
     if dff.empty:
         st.warning("No data after filters.")
@@ -174,16 +224,16 @@ def main():
 
     # KPI
     c1, c2, c3, c4, c5 = st.columns(5)
-    c1.metric("Commits", f"{len(dff):,}")
-    c2.metric("Authors", f"{dff['author_key'].nunique():,}")
-    c3.metric("Churn", f"{int(dff['churn'].sum()):,}")
-    c4.metric("Net", f"{int(dff['net'].sum()):,}")
-    c5.metric("Avg churn/commit", f"{dff['churn'].mean():.1f}")
+    c1.metric("Commits", f"{kpis['commits']:,}")
+    c2.metric("Authors", f"{kpis['authors']:,}")
+    c3.metric("Churn", f"{kpis['churn']:,}")
+    c4.metric("Net", f"{kpis['net']:,}")
+    c5.metric("Avg churn/commit", f"{kpis['avg_churn']:.1f}")
 
     st.divider()
 
     # Leaderboard
-    lb = leaderboard(add_derived(dff))
+    lb = leaderboard(dff)
 
     left, right = st.columns([1.25, 1])
     lb_view = lb.drop(columns=["author_key","med_churn","small_ratio","tiny_ratio","big_ratio","first_commit","last_commit"], errors="ignore")
@@ -208,22 +258,28 @@ def main():
         top_commits = lb.sort_values("commits", ascending=False).head(30)
         fig = px.bar(top_commits, x="author", y="commits")
         fig.update_layout(xaxis_title="", yaxis_title="commits")
-        st.plotly_chart(fig, width="stretch")
+        st.plotly_chart(fig, width="stretch", theme=None)
 
         top_churn = lb.sort_values("churn", ascending=False).head(30)
         fig2 = px.bar(top_churn, x="author", y="churn")
         fig2.update_layout(xaxis_title="", yaxis_title="churn (added+deleted)")
-        st.plotly_chart(fig2, width="stretch")
+        st.plotly_chart(fig2, width="stretch", theme=None)
 
     st.divider()
 
     # Timeline
     st.subheader("Timeline")
     mode = st.radio("Series", ["commits", "churn", "net"], horizontal=True, index=0)
-    ws = weekly_series(add_derived(dff), mode)
-    fig3 = px.line(ws, x="week", y="v", color="author_label")
-    fig3.update_layout(xaxis_title="", yaxis_title=mode)
-    st.plotly_chart(fig3, width="stretch")
+    ws = weekly_series(dff, mode)
+    # one WebGL line per author, in order of first appearance (as px.line colors them)
+    fig3 = go.Figure(
+        [
+            go.Scattergl(x=g["week"], y=g["v"], mode="lines", name=str(label), legendgroup=str(label))
+            for label, g in ws.groupby("author_label", observed=True, sort=False)
+        ]
+    )
+    fig3.update_layout(xaxis_title="", yaxis_title=mode, legend_title_text="author_label", uirevision="static")
+    st.plotly_chart(fig3, width="stretch", theme=None)
 
     st.divider()
 
@@ -237,9 +293,10 @@ def main():
         size="active_days",
         hover_name="author",
         color="tiny_ratio",
+        render_mode="webgl",
     )
-    fig4.update_layout(xaxis_title="commits", yaxis_title="churn", legend_title="tiny_ratio %")
-    st.plotly_chart(fig4, width="stretch")
+    fig4.update_layout(xaxis_title="commits", yaxis_title="churn", legend_title="tiny_ratio %", uirevision="static")
+    st.plotly_chart(fig4, width="stretch", theme=None)
 
     st.divider()
 
@@ -255,16 +312,16 @@ def main():
     pick_label = st.selectbox("Heatmap author", options=hm_people["author_label"].tolist())
     pick_key = hm_people[hm_people["author_label"] == pick_label]["author_key"].iloc[0]
 
-    cal = calendar_heatmap_df(add_derived(dff), pick_key, metric_mode)
+    cal = calendar_heatmap_df(dff, pick_key, metric_mode)
 
     if not cal.empty:
         max_week = int(cal["week_i"].max())
         grid = np.full((7, max_week + 1), np.nan)
 
-        for _, r in cal.iterrows():
-            wd = int(r["weekday"])
-            wi = int(r["week_i"])
-            grid[wd, wi] = r["v"] if np.isnan(grid[wd, wi]) else (grid[wd, wi] + r["v"])
+        # cal is grouped per day, so each (weekday, week_i) cell is written at most once
+        wd = cal["weekday"].to_numpy(np.intp)
+        wi = cal["week_i"].to_numpy(np.intp)
+        grid[wd, wi] = cal["v"].to_numpy(np.float64)
 
         ylabels = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
         xlabels = list(range(max_week + 1))
@@ -283,7 +340,7 @@ def main():
             height=300,
             margin=dict(l=10, r=10, t=10, b=10),
         )
-        st.plotly_chart(fig5, width="stretch")
+        st.plotly_chart(fig5, width="stretch", theme=None)
     else:
         st.info("No heatmap data for this author in current filters.")
 
@@ -292,7 +349,8 @@ def main():
     # commits table
     st.subheader("Commits table (filtered)")
     show_cols = ["date", "author_label", "churn", "net", "files", "subject", "hash"]
-    out = dff.sort_values("date", ascending=False)[show_cols].copy()
+    out = dff.sort_values("date", ascending=False)[[c for c in show_cols if c != "subject"]]
+    out = out.join(load_subjects(repo, branch, include_merges, head), on="hash")[show_cols]
     out = out.rename(columns={"author_label": "author"})
 
     st.dataframe(out, width="stretch", height=500)
@@ -1,8 +1,20 @@
 from __future__ import annotations
 import hashlib
+import json
 import os
+from dataclasses import replace
 from pathlib import Path
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from gitpulse.gitlog import GitLogOptions, scan_commits, is_ancestor
+from gitpulse.metrics import add_derived
+
+# low-cardinality string columns, stored as Arrow dictionary arrays
+_CATEGORY_COLS = ("author_key", "author_label", "email", "author")
+# high-cardinality, only needed by the commits table: kept out of the main cache file
+_SIDECAR_COLS = ("subject",)
 
 def _safe_repo_id(repo_path: str, branch: str | None) -> str:
     p = os.path.abspath(os.path.expanduser(repo_path))
@@ -16,17 +28,106 @@ def cache_dir() -> Path:
     return base
 
 def cache_path_for(repo_path: str, branch: str | None) -> Path:
-    return cache_dir() / f"{_safe_repo_id(repo_path, branch)}.pkl"
+    return cache_dir() / f"{_safe_repo_id(repo_path, branch)}.feather"
+
+def _meta_path_for(repo_path: str, branch: str | None) -> Path:
+    # sidecar with scan parameters (head commit, include_merges) used for invalidation
+    return cache_path_for(repo_path, branch).with_suffix(".json")
+
+def _subjects_path_for(repo_path: str, branch: str | None) -> Path:
+    return cache_path_for(repo_path, branch).with_suffix(".subjects.feather")
 
 def load_cached(repo_path: str, branch: str | None) -> pd.DataFrame | None:
     p = cache_path_for(repo_path, branch)
     if p.exists():
         try:
-            return pd.read_pickle(p)
+            return feather.read_feather(p, use_threads=True)
         except Exception:
             return None
     return None
 
-def save_cached(repo_path: str, branch: str | None, df: pd.DataFrame) -> None:
+def load_cached_subjects(repo_path: str, branch: str | None) -> pd.DataFrame | None:
+    p = _subjects_path_for(repo_path, branch)
+    if p.exists():
+        try:
+            return feather.read_feather(p, use_threads=True)
+        except Exception:
+            return None
+    return None
+
+def load_cache_meta(repo_path: str, branch: str | None) -> dict:
+    p = _meta_path_for(repo_path, branch)
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def save_cached(repo_path: str, branch: str | None, df: pd.DataFrame, meta: dict | None = None) -> None:
+    """
+    Write the core columns to the main cache file and subjects (if present) to a
+    sidecar, so the dashboard hot path never reads them. A frame without a subject
+    column leaves the existing sidecar untouched.
+    """
     p = cache_path_for(repo_path, branch)
-    df.to_pickle(p)
+    core = df.drop(columns=list(_SIDECAR_COLS), errors="ignore")
+    core = core.assign(**{c: core[c].astype("category") for c in _CATEGORY_COLS if c in core.columns})
+    feather.write_feather(pa.Table.from_pandas(core, preserve_index=False), p, compression="zstd")
+
+    if "subject" in df.columns:
+        subjects = pa.Table.from_pandas(df[["hash", "subject"]], preserve_index=False)
+        feather.write_feather(subjects, _subjects_path_for(repo_path, branch), compression="zstd")
+
+    # never leave metadata describing older data next to a fresh cache
+    mp = _meta_path_for(repo_path, branch)
+    if meta is None:
+        mp.unlink(missing_ok=True)
+    else:
+        mp.write_text(json.dumps(meta), encoding="utf-8")
+
+def ensure_derived(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cache can have old columns. Always recompute author_key/label + time fields.
+    """
+    if df is None or df.empty:
+        return df
+    # Always enforce date type and recompute derived fields (key/label logic changes)
+    if not isinstance(df["date"].dtype, pd.DatetimeTZDtype):
+        df["date"] = pd.to_datetime(df["date"], utc=True, errors="coerce")
+    return add_derived(df)
+
+def refresh_cache(repo_path: str, branch: str | None, include_merges: bool, head: str | None = None) -> pd.DataFrame:
+    """
+    Derived commit frame (without subjects) for the given scan parameters.
+    The disk cache is reused when it was scanned at head, extended with only the
+    new commits when head moved forward, and rebuilt otherwise (rewritten history,
+    different merge setting, no metadata).
+    """
+    opts = GitLogOptions(include_merges=include_merges, branch=branch)
+    meta = {"head": head, "include_merges": include_merges}
+
+    df = load_cached(repo_path, branch)
+    cached = load_cache_meta(repo_path, branch)
+    if df is not None and not df.empty and cached.get("include_merges") == include_merges:
+        if "subject" in df.columns:
+            # cache written before subjects moved to a sidecar: split it once
+            save_cached(repo_path, branch, df, cached)
+        cached_head = cached.get("head")
+        if head is None or cached_head == head:
+            return ensure_derived(df.drop(columns="subject", errors="ignore"))
+        if cached_head and is_ancestor(repo_path, cached_head, head):
+            new = scan_commits(repo_path, replace(opts, since=cached_head))
+            if not new.empty:
+                old = df[new.columns.drop("subject")]
+                subjects = load_cached_subjects(repo_path, branch)
+                old = old.join(subjects.set_index("hash"), on="hash") if subjects is not None else old.assign(subject=pd.NA)
+                old = old[new.columns].astype(new.dtypes.to_dict())
+                df = pd.concat([old, new], ignore_index=True)
+                df = df.drop_duplicates("hash", keep="last").sort_values("date")
+            df = ensure_derived(df)
+            save_cached(repo_path, branch, df, meta)
+            return df.drop(columns="subject", errors="ignore")
+
+    df = scan_commits(repo_path, opts)
+    df = add_derived(df)
+    save_cached(repo_path, branch, df, meta)
+    return df.drop(columns="subject", errors="ignore")
@@ -2,26 +2,25 @@ from __future__ import annotations
 import argparse
 import os
 import pandas as pd
-from gitpulse.gitlog import scan_commits, GitLogOptions
-from gitpulse.cache import load_cached, save_cached
+from gitpulse.gitlog import scan_commits, GitLogOptions, head_sha
+from gitpulse.cache import refresh_cache, save_cached
 from gitpulse.metrics import add_derived, leaderboard
 
 def cmd_scan(args: argparse.Namespace) -> int:
     repo = os.path.expanduser(args.repo)
     branch = args.branch or None
+    meta = {"head": head_sha(repo, branch), "include_merges": not args.no_merges}
     df = scan_commits(repo, GitLogOptions(include_merges=not args.no_merges, branch=branch))
     df = add_derived(df)
-    save_cached(repo, branch, df)
+    save_cached(repo, branch, df, meta)
     print(f"OK: scanned {len(df)} commits, cached.")
     return 0
 
 def cmd_summary(args: argparse.Namespace) -> int:
     repo = os.path.expanduser(args.repo)
     branch = args.branch or None
-    df = load_cached(repo, branch)
-    if df is None:
-        df = add_derived(scan_commits(repo, GitLogOptions(include_merges=not args.no_merges, branch=branch)))
-        save_cached(repo, branch, df)
+    # same cache validation as the dashboard: stale head or other merge setting -> (incremental) re-scan
+    df = refresh_cache(repo, branch, not args.no_merges, head_sha(repo, branch))
     lb = leaderboard(df)
     print(lb.head(15).to_string(index=False))
     return 0
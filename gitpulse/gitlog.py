@@ -1,18 +1,32 @@
 from __future__ import annotations
 import os
+import re
 import subprocess
+import tempfile
 from dataclasses import dataclass
-from datetime import datetime
+from functools import lru_cache
+from typing import Iterator
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from gitpulse._numstat import parse_numstat
 
 FIELD_SEP = "\x1f"
 REC_SEP = "\x1e"   # record marker at the BEGINNING of a commit
+STRING_DTYPE = "string[pyarrow]"
+
+_HEADER_COLS = ["hash", "author", "email", "date", "subject"]
+_HEADER_FIELDS = ["hash", "parents", "author", "email", "date", "subject"]  # order in the pretty format
+_STRING_COLS = [c for c in _HEADER_COLS if c != "date"]
+_COUNT_COLS = ["added", "deleted", "files", "binary_files"]
+_COLUMNS = _HEADER_COLS + ["added", "deleted", "churn", "net", "files", "binary_files", "has_numstat"]
 
 @dataclass(frozen=True)
 class GitLogOptions:
     include_merges: bool = True
     branch: str | None = None
     all_branches: bool = False
+    since: str | None = None   # only commits not reachable from this one (incremental scan)
 
 def _run_git(repo_path: str, args: list[str]) -> str:
     repo = os.path.abspath(os.path.expanduser(repo_path))
@@ -24,6 +38,52 @@ def _run_git(repo_path: str, args: list[str]) -> str:
         raise RuntimeError(f"git failed: {' '.join(cmd)}\n{msg}")
     return out.decode("utf-8", errors="replace")
 
+def _run_git_stream(repo_path: str, args: list[str], bufsize: int = 1 << 20) -> Iterator[bytes]:
+    """
+    Yield raw stdout chunks that always end on a record boundary (REC_SEP),
+    so git output is parsed while it is still being produced.
+    """
+    repo = os.path.abspath(os.path.expanduser(repo_path))
+    cmd = ["git", "-C", repo] + args
+    sep = REC_SEP.encode("ascii")
+    # stderr goes to a file, not a pipe: nobody reads it before stdout ends, and a full
+    # stderr pipe would block git (and this loop) forever
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, bufsize=bufsize)
+        try:
+            residual = b""
+            while True:
+                block = proc.stdout.read(bufsize)
+                if not block:
+                    break
+                residual += block
+                # keep the (possibly incomplete) last record for the next read
+                cut = residual.rfind(sep)
+                if cut > 0:
+                    yield residual[:cut]
+                    residual = residual[cut:]
+            if residual:
+                yield residual
+
+            if proc.wait() != 0:
+                err.seek(0)
+                msg = err.read().decode("utf-8", errors="replace")
+                raise RuntimeError(f"git failed: {' '.join(cmd)}\n{msg}")
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+
+@lru_cache(maxsize=1)
+def _git_version() -> tuple[int, int]:
+    try:
+        out = subprocess.check_output(["git", "--version"], stderr=subprocess.STDOUT).decode("ascii", errors="replace")
+    except Exception:
+        return (0, 0)
+    m = re.search(r"(\d+)\.(\d+)", out)
+    return (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+
 def _is_git_repo(repo_path: str) -> bool:
     repo = os.path.abspath(os.path.expanduser(repo_path))
     try:
@@ -50,6 +110,52 @@ def current_branch(repo_path: str) -> str | None:
 def is_git_repo(repo_path: str) -> bool:
     return _is_git_repo(repo_path)
 
+def head_sha(repo_path: str, branch: str | None = None) -> str | None:
+    if not _is_git_repo(repo_path):
+        return None
+    try:
+        out = _run_git(repo_path, ["rev-parse", "--verify", f"{branch or 'HEAD'}^{{commit}}"]).strip()
+        return out or None
+    except Exception:
+        return None
+
+def is_ancestor(repo_path: str, ancestor: str, descendant: str) -> bool:
+    try:
+        _run_git(repo_path, ["merge-base", "--is-ancestor", ancestor, descendant])
+        return True
+    except Exception:
+        return False
+
+def _parse_records(chunk: bytes) -> dict[str, pa.Array | np.ndarray]:
+    """
+    Parse a chunk of complete records into per-column values (header strings as Arrow
+    arrays, dates as naive-UTC datetime64, numstat sums as int arrays), aligned per commit.
+    """
+    # numstat lines are summed straight from the bytes; only header lines get decoded
+    rec = parse_numstat(np.frombuffer(chunk, dtype=np.uint8), ord(REC_SEP))
+    spans = zip(rec["header_start"].tolist(), rec["header_end"].tolist())
+    lines = b"\n".join([chunk[s:e] for s, e in spans]).decode("utf-8", errors="replace").split("\n")
+
+    # header: <hash><FS><parents><FS><an><FS><ae><FS><ad><FS><s>
+    last = len(_HEADER_FIELDS) - 1
+    hdr = pd.Series(lines if len(rec["header_start"]) else [], dtype=object)
+    hdr = hdr.str.split(FIELD_SEP, n=last, expand=True).reindex(columns=range(last + 1))
+    valid = hdr[last].notna().to_numpy()
+    hdr = hdr[valid]
+    # merge = more than one parent; zeroed here too, for git without --diff-merges
+    parents = hdr[_HEADER_FIELDS.index("parents")].astype(STRING_DTYPE)
+    merge = parents.str.contains(" ", regex=False).to_numpy(bool)
+
+    out: dict[str, pa.Array | np.ndarray] = {
+        c: pa.array(hdr[_HEADER_FIELDS.index(c)], type=pa.string(), from_pandas=True) for c in _STRING_COLS
+    }
+    # --date=iso-strict: every value is ISO 8601, so the parser's ISO fast path applies
+    dates = pd.to_datetime(hdr[_HEADER_FIELDS.index("date")], utc=True, format="ISO8601", errors="coerce")
+    out["date"] = dates.dt.tz_localize(None).to_numpy()
+    for c in _COUNT_COLS:
+        out[c] = np.where(merge, 0, rec[c][valid]).astype(np.int32)
+    return out
+
 def scan_commits(repo_path: str, opts: GitLogOptions | None = None) -> pd.DataFrame:
     if opts is None:
         opts = GitLogOptions()
@@ -58,8 +164,8 @@ def scan_commits(repo_path: str, opts: GitLogOptions | None = None) -> pd.DataFr
         raise RuntimeError(f"Not a git repo: {repo_path}")
 
     # Record marker at the BEGINNING of a commit (key for correct --numstat parsing)
-    # First record line: <hash><FS><an><FS><ae><FS><ad><FS><s>
-    pretty = f"{REC_SEP}%H{FIELD_SEP}%an{FIELD_SEP}%ae{FIELD_SEP}%ad{FIELD_SEP}%s"
+    # First record line: <hash><FS><parents><FS><an><FS><ae><FS><ad><FS><s>
+    pretty = f"{REC_SEP}%H{FIELD_SEP}%P{FIELD_SEP}%an{FIELD_SEP}%ae{FIELD_SEP}%ad{FIELD_SEP}%s"
 
     args = ["log"]
     if not opts.include_merges:
@@ -68,6 +174,13 @@ def scan_commits(repo_path: str, opts: GitLogOptions | None = None) -> pd.DataFr
         args.append("--all")
     elif opts.branch:
         args.append(opts.branch)
+    elif opts.since:
+        args.append("HEAD")
+    if opts.since:
+        args.append(f"^{opts.since}")
+    if _git_version() >= (2, 31):
+        # merges count as 0 files / 0 churn: make sure git never diffs them (e.g. via log.diffMerges)
+        args.append("--diff-merges=off")
     args += [
         "--date=iso-strict",
         f"--pretty=format:{pretty}",
@@ -75,83 +188,27 @@ def scan_commits(repo_path: str, opts: GitLogOptions | None = None) -> pd.DataFr
         "--no-color",
     ]
 
-    raw = _run_git(repo_path, args)
-
-    # split by marker; the first element before the first marker is empty
-    records = raw.split(REC_SEP)
-    rows = []
-
-    for rec in records:
-        rec = rec.strip("\n")
-        if not rec.strip():
-            continue
-
-        lines = rec.splitlines()
-        header = lines[0]
-        parts = header.split(FIELD_SEP)
-        if len(parts) < 5:
-            continue
-
-        commit_hash, author_name, author_email, date_s, subject = parts[:5]
-
-        try:
-            dt = datetime.fromisoformat(date_s.replace("Z", "+00:00"))
-        except Exception:
-            dt = None
-
-        added = 0
-        deleted = 0
-        files = 0
-        binary_files = 0
-
-        # subsequent lines are --numstat (or empty)
-        for l in lines[1:]:
-            if not l.strip():
-                continue
-
-            # numstat: <added>\t<deleted>\t<path>
-            # path can contain tabs? rare, but split max 2 to be safe
-            cols = l.split("\t", 2)
-            if len(cols) < 3:
-                continue
-
-            a, d, _path = cols[0], cols[1], cols[2]
-            files += 1
-
-            # binary changes: "-" in numstat
-            if a == "-" or d == "-":
-                binary_files += 1
-                continue
-
-            try:
-                added += int(a)
-                deleted += int(d)
-            except ValueError:
-                # skip any weird lines
-                pass
-
-        churn = added + deleted
-        net = added - deleted
-
-        rows.append(
-            {
-                "hash": commit_hash,
-                "author": author_name,
-                "email": author_email,
-                "date": dt,
-                "subject": subject,
-                "added": added,
-                "deleted": deleted,
-                "churn": churn,
-                "net": net,
-                "files": files,
-                "binary_files": binary_files,
-                "has_numstat": files > 0,
-            }
-        )
-
-    df = pd.DataFrame(rows)
-    if not df.empty:
-        df["date"] = pd.to_datetime(df["date"], utc=True, errors="coerce")
-        df = df.sort_values("date")
-    return df
+    # column-wise buffers: one list of typed per-chunk arrays per field (Arrow strings,
+    # datetime64, int32), so no Python object per value outlives its chunk
+    buf: dict[str, list] = {c: [] for c in _HEADER_COLS + _COUNT_COLS}
+    for chunk in _run_git_stream(repo_path, args):
+        parsed = _parse_records(chunk)
+        for c, v in parsed.items():
+            buf[c].append(v)
+
+    if not sum(len(v) for v in buf["hash"]):
+        return pd.DataFrame()
+
+    # the chunks become the Arrow column as-is; the DataFrame is built once
+    data: dict[str, object] = {
+        c: pd.arrays.ArrowStringArray(pa.chunked_array(buf[c], type=pa.string())) for c in _STRING_COLS
+    }
+    data["date"] = pd.DatetimeIndex(np.concatenate(buf["date"])).tz_localize("UTC")
+    for c in _COUNT_COLS:
+        data[c] = np.concatenate(buf[c]).astype(np.int32, copy=False)
+    data["churn"] = data["added"] + data["deleted"]
+    data["net"] = data["added"] - data["deleted"]
+    data["has_numstat"] = data["files"] > 0
+
+    df = pd.DataFrame(data, columns=_COLUMNS)
+    return df.sort_values("date")
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
+from gitpulse.gitlog import STRING_DTYPE
 
 def _norm_email(email) -> str:
     if email is None or (isinstance(email, float) and pd.isna(email)):
@@ -12,10 +13,23 @@ def _author_key(email) -> str:
     e = _norm_email(email)
     return f"email:{e}"
 
+def _norm_email_series(email: pd.Series) -> pd.Series:
+    # vectorized _norm_email: Arrow compute kernels over the column instead of a call per row
+    s = email.astype(STRING_DTYPE).str.strip().str.lower().fillna("")
+    return s.mask(s == "nan", "")
+
+_INT32_COLS = ("added", "deleted", "churn", "net", "files", "binary_files")
+
 def add_derived(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
-    out = df.copy()
+    # shallow: every column below is assigned whole, never written in place
+    out = df.copy(deep=False)
+
+    # line/file counts fit int32 (fresh scans already are; older caches may hold int64)
+    for c in _INT32_COLS:
+        if c in out.columns and out[c].dtype != np.int32:
+            out[c] = out[c].astype(np.int32)
 
     # base time fields
     dt = out["date"]
@@ -24,10 +38,18 @@ def add_derived(df: pd.DataFrame) -> pd.DataFrame:
     else:
         dt = dt.dt.tz_convert("UTC")
 
-    out["day"] = dt.dt.date
-    out["week"] = dt.dt.tz_localize(None).dt.to_period("W").dt.start_time.dt.tz_localize("UTC")
-    out["month"] = dt.dt.tz_localize(None).dt.to_period("M").dt.start_time.dt.tz_localize("UTC")
-    out["weekday"] = dt.dt.weekday  # 0=Mon
+    # one UTC day array feeds day/week/month/weekday: plain datetime64 arithmetic
+    # instead of a Period round-trip per column (NaT propagates through all of them)
+    days = dt.dt.tz_localize(None).to_numpy("datetime64[D]")
+    nat = np.isnat(days)
+    weekday = (days.view(np.int64) + 3) % 7  # 1970-01-01 was a Thursday; 0=Mon
+    unit = f"datetime64[{dt.dt.unit}]"
+    week = days - weekday.astype("timedelta64[D]")
+    month = days.astype("datetime64[M]")
+    out["day"] = pd.Series(days.astype(unit), index=out.index).dt.tz_localize("UTC")
+    out["week"] = pd.Series(week.astype(unit), index=out.index).dt.tz_localize("UTC")
+    out["month"] = pd.Series(month.astype(unit), index=out.index).dt.tz_localize("UTC")
+    out["weekday"] = pd.arrays.IntegerArray(weekday.astype(np.int8), nat)
 
     # "substance" flags
     out["is_small"] = out["churn"] <= 0
@@ -35,22 +57,42 @@ def add_derived(df: pd.DataFrame) -> pd.DataFrame:
     out["is_big"] = out["churn"] >= 300
 
     # --- identity key + display ---
-    out["author_key"] = [_author_key(e) for e in out["email"]]
+    # normalize each distinct email once, then expand through codes (sorted, like astype("category"))
+    email_i, emails = pd.factorize(out["email"], use_na_sentinel=False)
+    norm_i, norms = pd.factorize(_norm_email_series(pd.Series(emails)), sort=True)
+    codes = norm_i[email_i]
+    out["author_key"] = pd.Categorical.from_codes(codes, categories="email:" + norms)
 
     # UI label: email only
-    def _label(row) -> str:
-        return _norm_email(row.get("email"))
-
-    out["author_label"] = out.apply(_label, axis=1)
+    out["author_label"] = pd.Categorical.from_codes(codes, categories=norms)
 
     return out
 
+def _top_labels(df: pd.DataFrame) -> pd.DataFrame:
+    # most common label per key: one vectorized count instead of value_counts() per group
+    counts = (
+        df.groupby(["author_key", "author_label"], observed=True, sort=False, dropna=False)
+        .size()
+        .sort_values(ascending=False, kind="stable")
+        .reset_index()
+    )
+    return counts.drop_duplicates("author_key")[["author_key", "author_label"]]
+
+def date_range_mask(dates: pd.Series, start, end) -> np.ndarray:
+    """
+    Boolean mask of rows whose UTC calendar day lies in [start, end] (inclusive),
+    as two datetime64 comparisons.
+    """
+    # tz-aware .values are naive UTC datetime64
+    days = dates.values
+    return (days >= np.datetime64(start, "D")) & (days < np.datetime64(end, "D") + 1)
+
 def leaderboard(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame()
 
     # group by author_key (email only)
-    g = df.groupby("author_key", dropna=False)
+    g = df.groupby("author_key", dropna=False, observed=True, sort=False)
 
     agg = g.agg(
         commits=("hash", "count"),
@@ -70,12 +112,7 @@ def leaderboard(df: pd.DataFrame) -> pd.DataFrame:
     ).reset_index()
 
     # use most common label for display per key
-    top_label = (
-        df.groupby("author_key")["author_label"]
-        .agg(lambda s: s.value_counts().index[0] if len(s) else "")
-        .reset_index()
-        .rename(columns={"author_label": "author"})
-    )
+    top_label = _top_labels(df).rename(columns={"author_label": "author"})
 
     agg = agg.merge(top_label, on="author_key", how="left")
 
@@ -100,20 +137,33 @@ def leaderboard(df: pd.DataFrame) -> pd.DataFrame:
 def weekly_series(df: pd.DataFrame, value_col: str) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame()
-    base = df.copy()
     if value_col == "commits":
-        base["v"] = 1
+        v = np.ones(len(df), dtype=np.int64)
     else:
-        base["v"] = base[value_col]
-    s = base.groupby(["week", "author_key"], dropna=False)["v"].sum().reset_index()
-    # use label for legend
-    lbl = (
-        base.groupby("author_key")["author_label"]
-        .agg(lambda x: x.value_counts().index[0])
-        .reset_index()
+        v = df[value_col].to_numpy(np.int64)
+
+    # (week, author) -> one int64 key; after a stable sort every group is a contiguous run,
+    # so sums are a single np.add.reduceat instead of a hash groupby
+    week_i, weeks = pd.factorize(df["week"], sort=True, use_na_sentinel=False)
+    key_i, keys = pd.factorize(df["author_key"], sort=True, use_na_sentinel=False)
+    key = week_i.astype(np.int64) * len(keys) + key_i
+    order = np.argsort(key, kind="stable")
+    key = key[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(key)) + 1))
+
+    gk = key[starts]
+    s = pd.DataFrame(
+        {
+            "week": weeks.take(gk // len(keys)),
+            "author_key": keys.take(gk % len(keys)),
+            "v": np.add.reduceat(v[order], starts),
+        }
     )
+    # use label for legend
+    lbl = _top_labels(df)
     s = s.merge(lbl, on="author_key", how="left")
-    return s.sort_values("week")
+    # keys are ordered by week first, so s is already sorted by week
+    return s
 
 def calendar_heatmap_df(df: pd.DataFrame, author_key: str, mode: str) -> pd.DataFrame:
     if df.empty:
@@ -128,9 +178,10 @@ def calendar_heatmap_df(df: pd.DataFrame, author_key: str, mode: str) -> pd.Data
     else:
         dfa["v"] = dfa[mode]
 
-    day = pd.to_datetime(dfa["date"].dt.date)
-    dfa["day_ts"] = day
-    daily = dfa.groupby("day_ts")["v"].sum().reset_index()
+    # UTC calendar day straight from datetime64 (no per-row datetime.date objects)
+    dfa["day_ts"] = dfa["date"].values.astype("datetime64[D]")
+    # NaT days are dropped: they have no cell on the grid; order does not matter for the grid
+    daily = dfa.groupby("day_ts", sort=False)["v"].sum().reset_index()
 
     daily["weekday"] = daily["day_ts"].dt.weekday
     daily["week_start"] = (daily["day_ts"] - pd.to_timedelta(daily["weekday"], unit="D"))